@@ -6,9 +6,11 @@ Deep Extract - 深度页面抓取 & 网盘链接提取
   extract — 从 stdin 读取页面列表，深度抓取并提取网盘链接 (NDJSON)
 """
 
+import asyncio
 import json
 import re
 import sys
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import quote, urlparse
 
@@ -21,6 +23,22 @@ except ImportError:
     }, sys.stdout, ensure_ascii=False)
     sys.exit(1)
 
+try:
+    import aiohttp
+except ImportError:
+    # 旧的 venv 可能只装了 cloudscraper，此时退回线程池抓取
+    aiohttp = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ============ 链接匹配模式 ============
 
 PAN_PATTERNS = {
@@ -32,6 +50,18 @@ PAN_PATTERNS = {
 
 MAGNET_PATTERN = re.compile(r'magnet:\?xt=urn:btih:[a-zA-Z0-9]+')
 
+# LINK_PATTERN 能匹配到的链接必然包含其中之一；页面里一个都没有时跳过正则扫描
+LINK_MARKERS = ('pan.quark.cn', 'pan.baidu.com', 'alipan.com', 'drive.uc.cn', 'magnet:')
+
+# 网盘 + 磁力合并为一个正则，单次扫描 HTML，按命名分组 (lastgroup) 区分类型
+LINK_PATTERN = re.compile('|'.join(
+    [f'(?P<{pan_type}>{pattern.pattern})' for pan_type, pattern in PAN_PATTERNS.items()]
+    + [f'(?P<magnet>{MAGNET_PATTERN.pattern})']
+))
+
+# 分享时会附带提取码的网盘类型；其余类型跳过提取码检测
+CODE_CARRIERS = {'baidu', 'quark', 'aliyun'}
+
 CODE_PATTERNS = [
     re.compile(r'(?:提取码|密码|提取密码)[：:\s]*([a-zA-Z0-9]{4,8})'),
     re.compile(r'(?:pwd|code)[=：:\s]*([a-zA-Z0-9]{4,8})', re.I),
@@ -44,6 +74,9 @@ QUALITY_PATTERNS = [
     (re.compile(r'480[pP]'), 'SD'),
 ]
 
+# 合并为一个正则，单次扫描；第 N 个捕获组对应 QUALITY_PATTERNS[N-1]，序号越小优先级越高
+QUALITY_RE = re.compile('|'.join(f'({pattern.pattern})' for pattern, _ in QUALITY_PATTERNS))
+
 
 # ============ 辅助函数 ============
 
@@ -61,18 +94,21 @@ def extract_title(html):
     return ''
 
 
-def detect_quality(ctx):
-    """检测画质标记"""
-    for pattern, label in QUALITY_PATTERNS:
-        if pattern.search(ctx):
-            return label
-    return ''
+def detect_quality(html, start, end):
+    """检测 html[start:end] 范围内的画质标记"""
+    best = None
+    for m in QUALITY_RE.finditer(html, start, end):
+        if best is None or m.lastindex < best:
+            best = m.lastindex
+            if best == 1:
+                break
+    return QUALITY_PATTERNS[best - 1][1] if best else ''
 
 
-def find_extract_code(ctx):
-    """查找提取码/密码"""
+def find_extract_code(html, start, end):
+    """在 html[start:end] 范围内查找提取码/密码"""
     for pattern in CODE_PATTERNS:
-        m = pattern.search(ctx)
+        m = pattern.search(html, start, end)
         if m:
             return m.group(1)
     return ''
@@ -89,131 +125,287 @@ def create_scraper():
     )
 
 
+# search 命令共用一个 scraper: Cloudflare 验证结果和连接池在所有查询间复用
+_SCRAPER = None
+_SCRAPER_LOCK = threading.Lock()
+
+
+def get_scraper():
+    """获取进程内共享的 cloudscraper 实例（首次调用时创建）"""
+    global _SCRAPER
+    with _SCRAPER_LOCK:
+        if _SCRAPER is None:
+            _SCRAPER = create_scraper()
+        return _SCRAPER
+
+
+def write_json_line(obj):
+    """向 stdout 输出一行 JSON 并立即 flush"""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(obj) + b'\n')
+        sys.stdout.flush()
+    else:
+        print(json.dumps(obj, ensure_ascii=False), flush=True)
+
+
 # ============ 搜索引擎 ============
 
+# 百度结果: <h3 class="...t/c-title..."><a href="URL">title</a></h3>（未安装 selectolax 时使用）
+BAIDU_RESULT_RE = re.compile(
+    r'<h3[^>]*class="[^"]*(?:\bt\b|c-title)[^"]*"[^>]*>\s*<a[^>]+href="(https?://[^"]+)"[^>]*>([\s\S]*?)</a>'
+)
+TAG_STRIP_RE = re.compile(r'<[^>]+>')
+
 # 百度搜索结果的 URL 是 baidu.com/link 跳转链接，不需要过滤
-SEARCH_ENGINE_PAGE_PATTERNS = [
-    re.compile(r'baidu\.com/s\?'),         # 百度搜索页
-    re.compile(r'bing\.com/search\?'),      # Bing 搜索页
-    re.compile(r'google\.com/search\?'),    # Google 搜索页
-    re.compile(r'so\.com/s\?'),             # 360 搜索页
-    re.compile(r'sogou\.com/web\?'),        # 搜狗搜索页
-]
+SEARCH_ENGINE_MARKERS = (
+    'baidu.com/s?',         # 百度搜索页
+    'bing.com/search?',     # Bing 搜索页
+    'google.com/search?',   # Google 搜索页
+    'so.com/s?',            # 360 搜索页
+    'sogou.com/web?',       # 搜狗搜索页
+)
 
 
 def _is_search_page_url(url):
     """判断 URL 是否是搜索引擎的搜索结果页面（非跳转链接）"""
-    for pattern in SEARCH_ENGINE_PAGE_PATTERNS:
-        if pattern.search(url):
-            return True
-    return False
+    return any(marker in url for marker in SEARCH_ENGINE_MARKERS)
+
+
+def _parse_baidu_results(html):
+    """解析百度结果页，返回 (url, title) 列表"""
+    if LexborHTMLParser is not None:
+        results = []
+        for a in LexborHTMLParser(html).css('h3.t > a, h3.c-title > a'):
+            href = a.attributes.get('href') or ''
+            if href.startswith(('http://', 'https://')):
+                results.append((href, a.text().strip()))
+        return results
+
+    return [
+        (m.group(1), TAG_STRIP_RE.sub('', m.group(2)).strip())
+        for m in BAIDU_RESULT_RE.finditer(html)
+    ]
+
+
+def _search_one(scraper, query, max_results):
+    """搜索单个关键词，返回 (url, title) 列表；失败时返回空列表"""
+    try:
+        url = f'https://www.baidu.com/s?wd={quote(query)}&rn={max_results}'
+        r = scraper.get(url, timeout=15)
+        if r.status_code != 200:
+            return []
+        return _parse_baidu_results(r.text)
+    except Exception:
+        return []
 
 
 def search_baidu(queries, max_results=10):
-    """用 cloudscraper 搜索百度，解析 HTML 提取搜索结果 URL 和标题"""
-    scraper = create_scraper()
+    """用 cloudscraper 并发搜索百度，解析 HTML 提取搜索结果 URL 和标题"""
+    if not queries:
+        return []
+
+    scraper = get_scraper()
     all_pages = []
     seen = set()
 
-    for query in queries:
-        try:
-            url = f'https://www.baidu.com/s?wd={quote(query)}&rn={max_results}'
-            r = scraper.get(url, timeout=15)
-
-            if r.status_code != 200:
-                continue
-
-            # 百度结果: <h3 class="...t/c-title..."><a href="URL">title</a></h3>
-            pattern = r'<h3[^>]*class="[^"]*(?:\bt\b|c-title)[^"]*"[^>]*>\s*<a[^>]+href="(https?://[^"]+)"[^>]*>([\s\S]*?)</a>'
-            for m in re.finditer(pattern, r.text):
-                page_url = m.group(1)
-                title = re.sub(r'<[^>]+>', '', m.group(2)).strip()
+    # 所有关键词同时发出，耗时取决于最慢的一个；结果仍按关键词顺序合并
+    with ThreadPoolExecutor(max_workers=min(len(queries), 4)) as pool:
+        for results in pool.map(lambda query: _search_one(scraper, query, max_results), queries):
+            for page_url, title in results:
                 if page_url not in seen and not _is_search_page_url(page_url):
                     seen.add(page_url)
                     all_pages.append({'url': page_url, 'title': title})
-        except Exception:
-            continue
 
     return all_pages[:max_results * 2]
 
 
 # ============ 核心抓取逻辑 ============
 
-def fetch_and_extract(page, scraper):
-    """访问单个页面，提取所有网盘链接"""
-    url = page.get('url', '')
-    page_title = page.get('title', '')
+# Cloudflare 挑战页的状态码，aiohttp 无法通过时交给 cloudscraper 处理
+CHALLENGE_STATUS = (403, 503)
 
-    if not url:
-        return []
+# 单页最多读取的字节数；网盘链接都在页面正文靠前位置，超出部分不再下载和扫描
+MAX_HTML_BYTES = 512 * 1024
+
+# 同一站点最多同时抓取的页面数（含 cloudscraper 回退请求）
+PER_HOST_LIMIT = 2
 
-    try:
-        r = scraper.get(url, timeout=8)
-        if r.status_code != 200:
-            sys.stderr.write(f'[extract] {url} -> HTTP {r.status_code}\n')
-            return []
-        html = r.text
-    except Exception as e:
-        sys.stderr.write(f'[extract] {url} -> 请求失败: {e}\n')
-        return []
 
+def extract_from_html(html, page_url, page_title=''):
+    """从页面 HTML 中提取所有网盘链接"""
     # 如果页面内容太短，可能是反爬页面
     if len(html) < 500:
-        sys.stderr.write(f'[extract] {url} -> 内容太短 ({len(html)} 字节)\n')
+        sys.stderr.write(f'[extract] {page_url} -> 内容太短 ({len(html)} 字节)\n')
         return []
 
-    title = extract_title(html) or page_title
-    results = []
-    seen_urls = set()
-
-    # 1. 提取各类网盘直链
-    for pan_type, pattern in PAN_PATTERNS.items():
-        for m in pattern.finditer(html):
-            pan_url = m.group(0)
-            if pan_url in seen_urls:
-                continue
-            seen_urls.add(pan_url)
+    if not any(marker in html for marker in LINK_MARKERS):
+        sys.stderr.write(f'[extract] {page_url} -> {len(html)} 字节, 找到 0 条链接\n')
+        return []
 
-            # 提取链接上下文（前后字符）用于画质和提取码检测
-            start = max(0, m.start() - 500)
-            end = min(len(html), m.end() + 300)
-            ctx = html[start:end]
+    title = extract_title(html) or page_title
+    # 同一链接可能出现多次: 按首次出现去重，只对去重后的链接做上下文检测
+    first_matches = {}
+    for m in LINK_PATTERN.finditer(html):
+        first_matches.setdefault(m.group(0), m)
 
-            results.append({
-                'title': title,
-                'pan': pan_type,
-                'url': pan_url,
-                'quality': detect_quality(ctx),
-                'extractCode': find_extract_code(ctx),
-                'source': 'deep-search',
-                'pageUrl': url,
-            })
+    results = []
+    for link_url, m in first_matches.items():
+        pan_type = m.lastgroup
 
-    # 2. 提取磁力链接
-    for m in MAGNET_PATTERN.finditer(html):
-        magnet_url = m.group(0)
-        if magnet_url not in seen_urls:
-            seen_urls.add(magnet_url)
-            ctx = html[max(0, m.start() - 300):min(len(html), m.end() + 200)]
+        # 磁力链接: 上下文窗口更小，没有提取码
+        if pan_type == 'magnet':
+            start = max(0, m.start() - 300)
+            end = min(len(html), m.end() + 200)
             results.append({
                 'title': title,
                 'pan': 'magnet',
-                'url': magnet_url,
-                'quality': detect_quality(ctx),
+                'url': link_url,
+                'quality': detect_quality(html, start, end),
                 'source': 'deep-search',
-                'pageUrl': url,
+                'pageUrl': page_url,
             })
+            continue
 
-    sys.stderr.write(f'[extract] {url} -> {len(html)} 字节, 找到 {len(results)} 条链接\n')
+        # 网盘直链: 提取链接上下文（前后字符）用于画质和提取码检测
+        start = max(0, m.start() - 500)
+        end = min(len(html), m.end() + 300)
+
+        results.append({
+            'title': title,
+            'pan': pan_type,
+            'url': link_url,
+            'quality': detect_quality(html, start, end),
+            'extractCode': find_extract_code(html, start, end) if pan_type in CODE_CARRIERS else '',
+            'source': 'deep-search',
+            'pageUrl': page_url,
+        })
+
+    sys.stderr.write(f'[extract] {page_url} -> {len(html)} 字节, 找到 {len(results)} 条链接\n')
     return results
 
 
+def fetch_and_extract(page, scraper):
+    """访问单个页面，提取所有网盘链接"""
+    url = page.get('url', '')
+    if not url:
+        return []
+
+    try:
+        with scraper.get(url, timeout=8, stream=True) as r:
+            if r.status_code != 200:
+                sys.stderr.write(f'[extract] {url} -> HTTP {r.status_code}\n')
+                return []
+            raw = r.raw.read(MAX_HTML_BYTES, decode_content=True)
+            # requests 对未声明 charset 的 text/* 默认 ISO-8859-1，中文页面按 UTF-8 解码
+            has_charset = 'charset=' in r.headers.get('Content-Type', '').lower()
+            html = raw.decode(r.encoding if has_charset else 'utf-8', errors='replace')
+    except Exception as e:
+        sys.stderr.write(f'[extract] {url} -> 请求失败: {e}\n')
+        return []
+
+    return extract_from_html(html, url, page.get('title', ''))
+
+
+# 每个工作线程一个 scraper: 复用 Cloudflare cookie 和 keep-alive 连接
+_tls = threading.local()
+
+
 def _worker(page):
-    """线程工作函数（每个线程创建自己的 scraper 实例）"""
-    scraper = create_scraper()
+    """线程工作函数（每个线程复用自己的 scraper 实例和连接池）"""
+    scraper = getattr(_tls, 'scraper', None)
+    if scraper is None:
+        scraper = create_scraper()
+        _tls.scraper = scraper
     return fetch_and_extract(page, scraper)
 
 
+async def _read_capped(stream):
+    """读取响应体，最多 MAX_HTML_BYTES 字节"""
+    chunks = []
+    size = 0
+    async for chunk in stream.iter_chunked(64 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= MAX_HTML_BYTES:
+            break
+    return b''.join(chunks)[:MAX_HTML_BYTES]
+
+
+async def _fetch(session, page):
+    """异步访问单个页面；遇到 Cloudflare 挑战时回退到 cloudscraper"""
+    url = page.get('url', '')
+    if not url:
+        return []
+
+    try:
+        async with session.get(url) as r:
+            status = r.status
+            if status == 200:
+                raw = await _read_capped(r.content)
+                html = raw.decode(r.charset or 'utf-8', errors='replace')
+    except Exception as e:
+        sys.stderr.write(f'[extract] {url} -> 请求失败: {e}\n')
+        return []
+
+    if status in CHALLENGE_STATUS:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _worker, page)
+    if status != 200:
+        sys.stderr.write(f'[extract] {url} -> HTTP {status}\n')
+        return []
+
+    return extract_from_html(html, url, page.get('title', ''))
+
+
+async def _fetch_polite(session, page, host_sems):
+    """按站点限流后抓取页面"""
+    host = urlparse(page.get('url', '')).netloc
+    sem = host_sems.get(host)
+    if sem is None:
+        sem = host_sems[host] = asyncio.Semaphore(PER_HOST_LIMIT)
+    async with sem:
+        return await _fetch(session, page)
+
+
+async def _run_async(pages, max_workers):
+    """单线程事件循环抓取: 所有页面共享一个连接池，完成一个输出一个"""
+    # 复用 cloudscraper 的浏览器指纹请求头；br 需要额外依赖，只接受 gzip/deflate
+    headers = dict(create_scraper().headers)
+    headers['Accept-Encoding'] = 'gzip, deflate'
+
+    connector = aiohttp.TCPConnector(limit=max_workers, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=8)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+        host_sems = {}
+        fetches = [_fetch_polite(session, page, host_sems) for page in pages]
+        for coro in asyncio.as_completed(fetches, timeout=20):
+            try:
+                results = await coro
+            except asyncio.TimeoutError:
+                break
+            except Exception:
+                # 单个页面失败不影响其他页面
+                continue
+            if results:
+                # NDJSON: 每完成一个页面，立即输出一行 JSON
+                write_json_line(results)
+
+
+def _run_threaded(pages, max_workers):
+    """线程池抓取（未安装 aiohttp 时使用）"""
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_worker, page): page for page in pages}
+        for future in as_completed(futures, timeout=20):
+            try:
+                results = future.result()
+                if results:
+                    # NDJSON: 每完成一个页面，立即输出一行 JSON
+                    write_json_line(results)
+            except Exception:
+                # 单个页面失败不影响其他页面
+                pass
+
+
 # ============ 主入口 ============
 
 def run_extract(max_workers=4):
@@ -222,7 +414,7 @@ def run_extract(max_workers=4):
         raw = sys.stdin.read()
         if not raw.strip():
             return
-        pages = json.loads(raw)
+        pages = orjson.loads(raw) if orjson is not None else json.loads(raw)
     except (json.JSONDecodeError, Exception) as e:
         json.dump({'success': False, 'error': f'输入解析失败: {e}'}, sys.stdout, ensure_ascii=False)
         print(flush=True)
@@ -233,17 +425,10 @@ def run_extract(max_workers=4):
 
     max_workers = max(1, min(max_workers, 8))
 
-    with ThreadPoolExecutor(max_workers=max_workers) as pool:
-        futures = {pool.submit(_worker, page): page for page in pages}
-        for future in as_completed(futures, timeout=20):
-            try:
-                results = future.result()
-                if results:
-                    # NDJSON: 每完成一个页面，立即输出一行 JSON
-                    print(json.dumps(results, ensure_ascii=False), flush=True)
-            except Exception:
-                # 单个页面失败不影响其他页面
-                pass
+    if aiohttp is not None:
+        asyncio.run(_run_async(pages, max_workers))
+    else:
+        _run_threaded(pages, max_workers)
 
 
 def main():
@@ -268,7 +453,7 @@ def main():
             queries = [sys.argv[2]]
         max_results = int(sys.argv[3]) if len(sys.argv) > 3 else 10
         pages = search_baidu(queries, max_results)
-        print(json.dumps(pages, ensure_ascii=False), flush=True)
+        write_json_line(pages)
 
     elif command == 'extract':
         # 提取命令: deep_extract.py extract [concurrency]
@@ -4,12 +4,11 @@ Hacker News API parser using Algolia search
 """
 
 import sys
-from datetime import datetime, timezone
 from pathlib import Path
 
 # Add shared directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "shared"))
-from web_utils import fetch_json
+from web_utils import fetch_json, fetch_json_many
 
 
 def parse_hackernews(source_config, keyword=None, limit=10):
@@ -24,15 +23,52 @@ def parse_hackernews(source_config, keyword=None, limit=10):
     Returns:
         List of article dicts
     """
-    articles = []
+    data = fetch_json(build_search_url(keyword, limit))
+    return parse_hits(data, source_config)
+
+
+def parse_hackernews_many(source_config, keywords, limit=10):
+    """
+    Search Hacker News for several keywords concurrently
+
+    All queries go through fetch_json_many (one aiohttp session with
+    keep-alive to Algolia when aiohttp is installed).
+
+    Args:
+        source_config: Dict with 'url', 'name'
+        keywords: List of keywords to search for
+        limit: Maximum number of articles to return per keyword
+
+    Returns:
+        List of article lists, aligned with keywords
+    """
+    urls = [build_search_url(keyword, limit) for keyword in keywords]
+    if not urls:
+        return []
 
-    # Build search query
+    payloads = fetch_json_many(urls, concurrency=8)
+    return [parse_hits(data, source_config) for data in payloads]
+
+
+def build_search_url(keyword, limit):
+    """Build the Algolia search URL for a keyword (front page if None)"""
     if keyword:
-        url = f"https://hn.algolia.com/api/v1/search?query={keyword}&tags=story&hitsPerPage={limit}"
-    else:
-        url = f"https://hn.algolia.com/api/v1/search?tags=front_page&hitsPerPage={limit}"
+        return f"https://hn.algolia.com/api/v1/search?query={keyword}&tags=story&hitsPerPage={limit}"
+    return f"https://hn.algolia.com/api/v1/search?tags=front_page&hitsPerPage={limit}"
+
 
-    data = fetch_json(url)
+def parse_hits(data, source_config):
+    """
+    Convert an Algolia search response into article dicts
+
+    Args:
+        data: Parsed Algolia JSON response (or None)
+        source_config: Dict with 'name'
+
+    Returns:
+        List of article dicts
+    """
+    articles = []
     if not data or "hits" not in data:
         return articles
 
@@ -50,14 +86,10 @@ def parse_hackernews(source_config, keyword=None, limit=10):
             num_comments = hit.get("num_comments", 0)
             summary = f"HN: {points} points, {num_comments} comments"
 
-            # Parse timestamp
-            published_at = None
-            if "created_at" in hit:
-                try:
-                    dt = datetime.fromisoformat(hit["created_at"].replace('Z', '+00:00'))
-                    published_at = dt.isoformat()
-                except:
-                    published_at = datetime.now(timezone.utc).isoformat()
+            # Algolia timestamps are ISO 8601 already; only normalize the 'Z' suffix
+            published_at = hit.get("created_at") or None
+            if published_at and published_at.endswith("Z"):
+                published_at = published_at[:-1] + "+00:00"
 
             articles.append({
                 "title": title,
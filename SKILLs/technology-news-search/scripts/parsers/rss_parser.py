@@ -5,13 +5,46 @@ Generic RSS/Atom feed parser
 
 import re
 import sys
+import xml.etree.ElementTree as ET
 from datetime import datetime, timezone
+from html import unescape
+from itertools import islice
 from pathlib import Path
 
 # Add shared directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "shared"))
 from web_utils import fetch_url
 
+# Precompiled patterns for the regex fallback and clean_html
+ITEM_RE = re.compile(r'<item>(.*?)</item>', re.DOTALL)
+ENTRY_RE = re.compile(r'<entry>(.*?)</entry>', re.DOTALL)
+TITLE_RE = re.compile(r'<title>(.*?)</title>', re.DOTALL)
+LINK_RE = re.compile(r'<link>(.*?)</link>', re.DOTALL)
+LINK_HREF_RE = re.compile(r'<link[^>]+href=["\']([^"\']+)["\']')
+DESC_RE = re.compile(r'<description>(.*?)</description>', re.DOTALL)
+SUMMARY_RE = re.compile(r'<summary>(.*?)</summary>', re.DOTALL)
+CONTENT_RE = re.compile(r'<content[^>]*>(.*?)</content>', re.DOTALL)
+PUBDATE_RE = re.compile(r'<pubDate>(.*?)</pubDate>', re.DOTALL)
+PUBLISHED_RE = re.compile(r'<published>(.*?)</published>', re.DOTALL)
+UPDATED_RE = re.compile(r'<updated>(.*?)</updated>', re.DOTALL)
+CDATA_RE = re.compile(r'<!\[CDATA\[(.*?)\]\]>', re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+# Title start tags in document order (flagging CDATA-wrapped ones); CDATA
+# sections and comments are matched too so tags inside them are skipped
+TITLE_START_RE = re.compile(
+    r'<!\[CDATA\[.*?\]\]>|<!--.*?-->|<(?:[\w.-]+:)?title\b[^>]*>(\s*<!\[CDATA\[)?', re.DOTALL
+)
+ENTITY_RE = re.compile(r'&(?:#\d+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);')
+WS_RE = re.compile(r'\s+')
+UPVOTES_RE = re.compile(r'(\d+)\s+(points?|upvotes?)', re.IGNORECASE)
+ISO_DATETIME_RE = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:\d{2})?$')
+
+# Characters fed to the XML pull parser at a time
+XML_FEED_CHUNK = 64 * 1024
+
+# Attribute set on <title> elements whose text came from a CDATA section
+CDATA_ATTR = "{rss_parser}cdata"
+
 
 def extract_reddit_upvotes(content: str) -> int:
     """
@@ -26,7 +59,7 @@ def extract_reddit_upvotes(content: str) -> int:
         Upvote count (0 if not found)
     """
     # Try to find patterns like "123 points" or "123 upvotes"
-    match = re.search(r'(\d+)\s+(points?|upvotes?)', content, re.IGNORECASE)
+    match = UPVOTES_RE.search(content)
     if match:
         return int(match.group(1))
     return 0
@@ -50,55 +83,42 @@ def parse_rss_feed(source_config, keyword=None, limit=10):
     if not content:
         return articles
 
-    # Extract items/entries
-    # Try RSS <item> tags first
-    item_pattern = r'<item>(.*?)</item>'
-    items = re.findall(item_pattern, content, re.DOTALL)
-
-    # If no items, try Atom <entry> tags
-    if not items:
-        item_pattern = r'<entry>(.*?)</entry>'
-        items = re.findall(item_pattern, content, re.DOTALL)
+    keyword_lower = keyword.lower() if keyword else None
 
-    for item in items[:limit * 2]:  # Get more than limit for filtering
+    for fields in iter_feed_items(content, limit * 2):  # Get more than limit for filtering
         try:
-            # Extract title
-            title_match = re.search(r'<title>(.*?)</title>', item, re.DOTALL)
-            if not title_match:
+            if fields["title"] is None or not fields["link"]:
                 continue
-            title = clean_html(title_match.group(1))
 
-            # Extract link/url
-            link_match = re.search(r'<link>(.*?)</link>', item, re.DOTALL) or \
-                        re.search(r'<link[^>]+href=["\']([^"\']+)["\']', item)
-            if not link_match:
+            # Cheap keyword pre-check on the raw text before any HTML cleaning
+            if keyword_lower and not _could_match(fields["title"], keyword_lower) and \
+                    not _could_match(fields["summary"], keyword_lower):
                 continue
-            url = clean_html(link_match.group(1))
+
+            # Extract title (plain-text titles from the XML parser are already
+            # entity-decoded, so literal "<T>" in them is text, not markup)
+            title = clean_html(fields["title"], unescaped=fields["decoded"] and not fields["title_html"])
+
+            # Extract link/url
+            url = clean_html(fields["link"], unescaped=fields["decoded"])
 
             # Extract summary/description
-            summary_match = re.search(r'<description>(.*?)</description>', item, re.DOTALL) or \
-                          re.search(r'<summary>(.*?)</summary>', item, re.DOTALL) or \
-                          re.search(r'<content[^>]*>(.*?)</content>', item, re.DOTALL)
             summary = ""
-            if summary_match:
-                summary = clean_html(summary_match.group(1))
+            if fields["summary"]:
+                summary = clean_html(fields["summary"])
                 # Limit summary length
                 summary = summary[:300] + "..." if len(summary) > 300 else summary
 
             # Extract publish date
-            pub_date_match = re.search(r'<pubDate>(.*?)</pubDate>', item, re.DOTALL) or \
-                           re.search(r'<published>(.*?)</published>', item, re.DOTALL) or \
-                           re.search(r'<updated>(.*?)</updated>', item, re.DOTALL)
             published_at = None
-            if pub_date_match:
+            if fields["published"]:
                 try:
-                    published_at = parse_date(pub_date_match.group(1))
+                    published_at = parse_date(fields["published"])
                 except:
                     pass
 
             # Keyword filtering
-            if keyword:
-                keyword_lower = keyword.lower()
+            if keyword_lower:
                 if keyword_lower not in title.lower() and keyword_lower not in summary.lower():
                     continue
 
@@ -115,7 +135,7 @@ def parse_rss_feed(source_config, keyword=None, limit=10):
 
             # Extract Reddit upvotes if this is a Reddit source
             if "reddit.com" in source_config.get("url", ""):
-                upvotes = extract_reddit_upvotes(item)
+                upvotes = extract_reddit_upvotes(fields["raw"])
                 if upvotes > 0:
                     article["reddit_upvotes"] = upvotes
 
@@ -131,35 +151,203 @@ def parse_rss_feed(source_config, keyword=None, limit=10):
     return articles
 
 
-def clean_html(text):
-    """Remove HTML tags and decode entities"""
+def _could_match(raw, keyword_lower):
+    """
+    Whether clean_html(raw) might contain keyword_lower
+
+    Only answers False when cleaning provably cannot create a match: the
+    keyword is absent and there is no markup, entity or whitespace run
+    for tag stripping / decoding / folding to rewrite.
+    """
+    if not raw:
+        return False
+    if keyword_lower in raw.lower():
+        return True
+    return "<" in raw or "&" in raw or any(c.isspace() for c in keyword_lower)
+
+
+def iter_feed_items(content, max_items):
+    """
+    Yield raw fields for up to max_items feed items
+
+    Feeds are stream-parsed as XML; documents that are not well-formed
+    (common with hand-rolled feeds) fall back to regex scanning.
+
+    Args:
+        content: Feed document text
+        max_items: Maximum number of items to yield
+
+    Yields:
+        Dicts with keys: title, link, summary, published (raw strings or None),
+        raw (item text used for engagement extraction), decoded (whether
+        the strings are already entity-decoded by the XML parser) and
+        title_html (whether the decoded title is HTML markup)
+    """
+    yielded = 0
+    try:
+        for fields in _iter_xml_items(content):
+            yield fields
+            yielded += 1
+            if yielded >= max_items:
+                return
+        return
+    except ET.ParseError:
+        pass
+
+    # Rescan the whole document, skipping the items already yielded
+    for fields in islice(_iter_regex_items(content, max_items), yielded, None):
+        yield fields
+
+
+def _iter_xml_items(content):
+    """Stream-parse a feed with expat, clearing each <item>/<entry> once read"""
+    parser = ET.XMLPullParser(events=("end",))
+    cdata_titles = _cdata_title_flags(content)
+    for offset in range(0, len(content), XML_FEED_CHUNK):
+        parser.feed(content[offset:offset + XML_FEED_CHUNK])
+        for fields in _drain_xml_items(parser, cdata_titles):
+            yield fields
+    parser.close()
+    for fields in _drain_xml_items(parser, cdata_titles):
+        yield fields
+
+
+def _cdata_title_flags(content):
+    """
+    Iterator of booleans, one per <title> element in document order: True
+    if its text is CDATA-wrapped (the XML parser does not report CDATA)
+    """
+    if "<![CDATA[" not in content:
+        return iter(())
+    return (match.group(1) is not None for match in TITLE_START_RE.finditer(content)
+            if not match.group(0).startswith("<!"))
+
+
+def _drain_xml_items(parser, cdata_titles):
+    for _, elem in parser.read_events():
+        name = _local_name(elem.tag)
+        if name == "title":
+            if next(cdata_titles, False):
+                elem.set(CDATA_ATTR, "1")
+        elif name in ("item", "entry"):
+            title, title_html = _xml_title(elem)
+            yield {
+                "title": title,
+                "link": _xml_item_link(elem),
+                "summary": _xml_child_text(elem, "description", "summary", "content", "encoded"),
+                "published": _xml_child_text(elem, "pubDate", "published", "updated"),
+                "raw": " ".join(elem.itertext()),
+                "decoded": True,
+                "title_html": title_html,
+            }
+            elem.clear()
+
+
+def _local_name(tag):
+    """Strip the '{namespace}' prefix ElementTree puts on tags"""
+    return tag.rpartition("}")[2]
+
+
+def _xml_title(elem):
+    """
+    Title text of an item and whether it is HTML: CDATA-wrapped, or an
+    Atom title of type "html"/"xhtml"
+
+    Returns:
+        Tuple of (text or None, is_html)
+    """
+    for child in elem:
+        if _local_name(child.tag) == "title":
+            text = "".join(child.itertext()).strip()
+            if text:
+                return text, child.get("type") in ("html", "xhtml") or child.get(CDATA_ATTR) == "1"
+    return None, False
+
+
+def _xml_child_text(elem, *names):
+    """Text of the first non-empty child matching names, in preference order"""
+    for name in names:
+        for child in elem:
+            if _local_name(child.tag) == name:
+                text = "".join(child.itertext()).strip()
+                if text:
+                    return text
+    return None
+
+
+def _xml_item_link(elem):
+    """RSS <link>url</link>, else Atom <link rel="alternate" href="url"/>"""
+    links = [child for child in elem if _local_name(child.tag) == "link"]
+    for link in links:
+        if link.text and link.text.strip():
+            return link.text.strip()
+    hrefs = [link for link in links if link.get("href")]
+    for link in hrefs:
+        if link.get("rel", "alternate") == "alternate":
+            return link.get("href")
+    return hrefs[0].get("href") if hrefs else None
+
+
+def _iter_regex_items(content, max_items):
+    """Regex fallback for feeds that are not well-formed XML"""
+    # Try RSS <item> tags first, then Atom <entry> tags; stop scanning at max_items
+    for pattern in (ITEM_RE, ENTRY_RE):
+        count = 0
+        for match in pattern.finditer(content):
+            yield _regex_item_fields(match.group(1))
+            count += 1
+            if count >= max_items:
+                return
+        if count:
+            return
+
+
+def _regex_item_fields(item):
+    title_match = TITLE_RE.search(item)
+    link_match = LINK_RE.search(item) or LINK_HREF_RE.search(item)
+    summary_match = DESC_RE.search(item) or \
+                  SUMMARY_RE.search(item) or \
+                  CONTENT_RE.search(item)
+    pub_date_match = PUBDATE_RE.search(item) or \
+                   PUBLISHED_RE.search(item) or \
+                   UPDATED_RE.search(item)
+    return {
+        "title": title_match.group(1) if title_match else None,
+        "link": link_match.group(1) if link_match else None,
+        "summary": summary_match.group(1) if summary_match else None,
+        "published": pub_date_match.group(1) if pub_date_match else None,
+        "raw": item,
+        "decoded": False,
+        "title_html": False,
+    }
+
+
+def clean_html(text, unescaped=False):
+    """
+    Remove HTML tags and decode entities
+
+    With unescaped=True the text is already decoded (e.g. by the XML
+    parser): tags are not stripped, so literal "<T>" survives, and only
+    complete "&...;" entities left over from CDATA or Atom type="html" text
+    are decoded, so a bare "&copy=2" in a URL is not.
+    """
     if not text:
         return ""
 
     # Remove CDATA
-    text = re.sub(r'<!\[CDATA\[(.*?)\]\]>', r'\1', text, flags=re.DOTALL)
-
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-
-    # Decode common HTML entities
-    entities = {
-        '&lt;': '<',
-        '&gt;': '>',
-        '&amp;': '&',
-        '&quot;': '"',
-        '&apos;': "'",
-        '&#39;': "'",
-        '&#x27;': "'",
-        '&nbsp;': ' ',
-        '&mdash;': '—',
-        '&ndash;': '–',
-    }
-    for entity, char in entities.items():
-        text = text.replace(entity, char)
+    text = CDATA_RE.sub(r'\1', text)
+
+    if unescaped:
+        text = ENTITY_RE.sub(lambda m: unescape(m.group(0)), text)
+    else:
+        # Remove HTML tags
+        text = TAG_RE.sub('', text)
+
+        # Decode HTML entities (named and numeric)
+        text = unescape(text)
 
     # Clean whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = WS_RE.sub(' ', text).strip()
 
     return text
 
@@ -168,6 +356,10 @@ def parse_date(date_str):
     """Parse various date formats to ISO 8601"""
     date_str = date_str.strip()
 
+    # ISO 8601 (Atom) is already the output format; only normalize a 'Z' suffix
+    if ISO_DATETIME_RE.match(date_str):
+        return normalize_iso_utc(date_str)
+
     # RFC 822 (RSS)
     try:
         from email.utils import parsedate_to_datetime
@@ -175,7 +367,7 @@ def parse_date(date_str):
     except:
         pass
 
-    # ISO 8601 (Atom)
+    # Other ISO 8601 shapes (e.g. date only)
     try:
         dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
         return dt.isoformat()
@@ -185,6 +377,11 @@ def parse_date(date_str):
     return datetime.now(timezone.utc).isoformat()
 
 
+def normalize_iso_utc(value):
+    """Rewrite a trailing 'Z' as '+00:00' without a datetime round-trip"""
+    return value[:-1] + '+00:00' if value.endswith('Z') else value
+
+
 if __name__ == "__main__":
     # Test with TechCrunch
     test_source = {
@@ -5,12 +5,14 @@ Technology news search engine
 Search across multiple tech news sources and rank by heat score
 """
 
+import heapq
 import json
 import sys
 import argparse
 from pathlib import Path
 from datetime import datetime, timezone
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add parsers and shared to path
 SCRIPT_DIR = Path(__file__).parent
@@ -19,46 +21,110 @@ sys.path.insert(0, str(SCRIPT_DIR / "shared"))
 
 from rss_parser import parse_rss_feed
 from hn_parser import parse_hackernews
-from heat_calculator import calculate_heat_score, find_duplicate_sources
+from heat_calculator import calculate_heat_scores, find_duplicate_sources, build_title_index
 from domain_classifier import classify_keyword, get_sources_for_domains
 from network_detector import filter_sources_by_network
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def load_sources():
-    """Load news sources from references/sources.json"""
+# Sources are fetched concurrently; the work is network-bound, so threads suffice
+MAX_FETCH_WORKERS = 16
+
+# Parsed sources.json, keyed by path -> (mtime_ns, sources)
+_SOURCES_CACHE = {}
+
+
+def load_sources(include_disabled=False):
+    """
+    Load news sources from references/sources.json (re-parsed only when the file changes)
+
+    Args:
+        include_disabled: Also return sources marked "enabled": false
+
+    Returns:
+        List of source config dicts
+    """
     sources_file = SCRIPT_DIR.parent / "references" / "sources.json"
-    with open(sources_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-        return data["sources"]
+    mtime_ns = sources_file.stat().st_mtime_ns
+
+    cached = _SOURCES_CACHE.get(sources_file)
+    if cached is None or cached[0] != mtime_ns:
+        if orjson is not None:
+            data = orjson.loads(sources_file.read_bytes())
+        else:
+            with open(sources_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        cached = _SOURCES_CACHE[sources_file] = (mtime_ns, data["sources"])
 
+    if include_disabled:
+        return list(cached[1])
+    return [source for source in cached[1] if source.get("enabled", True)]
 
-def balance_sources(articles, max_per_source=5):
+
+def select_top(articles, max_per_source=5):
     """
-    Balance articles across sources to ensure diversity
+    Pick the hottest articles while balancing sources to ensure diversity
+
+    Pops articles from a heap in heat score order (ties keep input order)
+    and stops once every source has reached its quota, so the list is
+    never fully sorted.
 
     Args:
-        articles: List of all articles (already sorted by heat score)
+        articles: List of all articles (with heat_score set)
         max_per_source: Maximum articles from each source
 
     Returns:
-        Balanced list of articles
+        Balanced list of articles, sorted by heat score
     """
+    # Skip articles without source field (defensive programming)
+    heap = [
+        (-article["heat_score"], index, article)
+        for index, article in enumerate(articles)
+        if article.get("source")
+    ]
+    heapq.heapify(heap)
+
     source_counts = defaultdict(int)
+    open_sources = len({entry[2]["source"] for entry in heap})
     balanced = []
 
-    for article in articles:
-        # Skip articles without source field (defensive programming)
-        source = article.get("source")
-        if not source:
-            continue
+    while heap and open_sources:
+        article = heapq.heappop(heap)[2]
+        source = article["source"]
 
         if source_counts[source] < max_per_source:
             balanced.append(article)
             source_counts[source] += 1
+            if source_counts[source] == max_per_source:
+                open_sources -= 1
 
     return balanced
 
 
+def _fetch_one(source, keyword, limit):
+    """
+    Fetch articles from a single source
+
+    Args:
+        source: Source config dict
+        keyword: Search keyword
+        limit: Max articles to fetch
+
+    Returns:
+        List of article dicts, or None if the source type is unsupported
+    """
+    if source["type"] == "api" and "hackernews" in source["id"]:
+        # Use HN API parser
+        return parse_hackernews(source, keyword=keyword, limit=limit)
+    elif source["type"] in ["rss", "newsletter_rss"]:
+        # Use RSS parser
+        return parse_rss_feed(source, keyword=keyword, limit=limit)
+    return None
+
+
 def search_news(keyword, limit=15, max_per_source=5, balance=True, all_sources=False):
     """
     Search for tech news across all sources
@@ -91,44 +157,50 @@ def search_news(keyword, limit=15, max_per_source=5, balance=True, all_sources=F
 
     articles_list = []
 
-    # Search each source
-    for source in sources:
-        if not source.get("enabled", True):
-            continue
+    # Search all sources concurrently; progress is reported as each one finishes
+    results = [[] for _ in sources]
 
-        print(f"  Fetching from {source['name']}...", file=sys.stderr)
+    if sources:
+        with ThreadPoolExecutor(max_workers=min(len(sources), MAX_FETCH_WORKERS)) as executor:
+            futures = {
+                executor.submit(_fetch_one, source, keyword, limit): index
+                for index, source in enumerate(sources)
+            }
+            for future in as_completed(futures):
+                source = sources[futures[future]]
 
-        try:
-            if source["type"] == "api" and "hackernews" in source["id"]:
-                # Use HN API parser
-                articles = parse_hackernews(source, keyword=keyword, limit=limit)
-            elif source["type"] in ["rss", "newsletter_rss"]:
-                # Use RSS parser
-                articles = parse_rss_feed(source, keyword=keyword, limit=limit)
-            else:
-                print(f"    Unsupported type: {source['type']}", file=sys.stderr)
-                continue
+                try:
+                    articles = future.result()
+                except Exception as e:
+                    print(f"  {source['name']}: Error: {e}", file=sys.stderr)
+                    continue
 
-            articles_list.extend(articles)
-            print(f"    Found {len(articles)} articles", file=sys.stderr)
+                if articles is None:
+                    print(f"  {source['name']}: Unsupported type: {source['type']}", file=sys.stderr)
+                    continue
 
-        except Exception as e:
-            print(f"    Error: {e}", file=sys.stderr)
-            continue
+                results[futures[future]] = articles
+                print(f"  {source['name']}: Found {len(articles)} articles", file=sys.stderr)
+
+    # Merge in source order so ranking ties stay deterministic
+    for articles in results:
+        articles_list.extend(articles)
 
     # Calculate heat scores
     print(f"\n📊 Calculating heat scores...\n", file=sys.stderr)
-    for article in articles_list:
-        article["heat_score"] = calculate_heat_score(article, articles_list, keyword)
-        article["duplicate_sources"] = find_duplicate_sources(article, articles_list)
-
-    # Sort by heat score
-    articles_list.sort(key=lambda x: x["heat_score"], reverse=True)
-
-    # Balance sources if enabled
+    title_index = build_title_index(articles_list)
+    now = datetime.now(timezone.utc)
+    scores = calculate_heat_scores(articles_list, keyword, title_index, now=now)
+    for article, score in zip(articles_list, scores):
+        article["heat_score"] = score
+        article["duplicate_sources"] = find_duplicate_sources(article, articles_list, title_index)
+
+    # Rank by heat score, balancing sources if enabled
     if balance:
         print(f"⚖️  Balancing sources (max {max_per_source} per source)...\n", file=sys.stderr)
-        articles_list = balance_sources(articles_list, max_per_source)
+        articles_list = select_top(articles_list, max_per_source)
+    else:
+        articles_list.sort(key=lambda x: x["heat_score"], reverse=True)
 
     # Prepare output
     result = {
@@ -141,6 +213,17 @@ def search_news(keyword, limit=15, max_per_source=5, balance=True, all_sources=F
     return result
 
 
+def write_json(result):
+    """Write result to stdout as indented JSON"""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_INDENT_2) + b"\n")
+        sys.stdout.flush()
+    else:
+        # Stream the encoder's chunks instead of building the whole string
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Search technology news")
     parser.add_argument("keyword", help="Search keyword")
@@ -165,7 +248,7 @@ def main():
     )
 
     # Output JSON
-    print(json.dumps(result, ensure_ascii=False, indent=2))
+    write_json(result)
 
     print(f"\n✅ Search complete! Found {result['total_found']} articles.", file=sys.stderr)
 
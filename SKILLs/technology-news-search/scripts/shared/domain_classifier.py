@@ -5,7 +5,15 @@ Classifies search keywords into technical domains to enable smart source routing
 Supports both English and Chinese keywords.
 """
 
-from typing import Set, Dict, List
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Set, FrozenSet, Dict, List
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 # Domain keyword patterns (English and Chinese)
 DOMAIN_KEYWORDS: Dict[str, List[str]] = {
@@ -211,6 +219,46 @@ DOMAIN_ALIASES: Dict[str, str] = {
 }
 
 
+def _build_automaton():
+    """
+    Build an Aho-Corasick automaton over all domain keyword patterns.
+
+    Each pattern maps to the tuple of domains listing it (some patterns,
+    e.g. "kotlin", belong to several domains).
+
+    Returns:
+        ahocorasick.Automaton, or None if pyahocorasick is not installed
+    """
+    if ahocorasick is None:
+        return None
+
+    pattern_domains: Dict[str, List[str]] = {}
+    for domain, patterns in DOMAIN_KEYWORDS.items():
+        for pattern in patterns:
+            domains = pattern_domains.setdefault(pattern, [])
+            if domain not in domains:
+                domains.append(domain)
+
+    automaton = ahocorasick.Automaton()
+    for pattern, domains in pattern_domains.items():
+        automaton.add_word(pattern, tuple(domains))
+    automaton.make_automaton()
+    return automaton
+
+
+# Matches every domain keyword in one pass over the query (None: use _DOMAIN_RES)
+_AUTOMATON = _build_automaton()
+
+# Fallback without pyahocorasick: one alternation regex per domain. A single
+# regex with a named group per domain would miss overlaps across domains
+# (e.g. "react native" is frontend "react" and mobile "react native").
+_DOMAIN_RES: Dict[str, "re.Pattern"] = {
+    domain: re.compile("|".join(re.escape(pattern) for pattern in patterns))
+    for domain, patterns in DOMAIN_KEYWORDS.items()
+}
+
+
+@lru_cache(maxsize=256)
 def resolve_alias(keyword_or_domain: str) -> str:
     """
     Resolve domain alias to canonical domain name.
@@ -232,7 +280,8 @@ def resolve_alias(keyword_or_domain: str) -> str:
     return DOMAIN_ALIASES.get(keyword_or_domain.lower(), keyword_or_domain)
 
 
-def classify_keyword(keyword: str) -> Set[str]:
+@lru_cache(maxsize=1024)
+def classify_keyword(keyword: str) -> FrozenSet[str]:
     """
     Classify search keyword into technical domains.
 
@@ -243,21 +292,22 @@ def classify_keyword(keyword: str) -> Set[str]:
         keyword: User search query (e.g., "Electron 前端框架", "ChatGPT 最新消息", "web development")
 
     Returns:
-        Set of domain names (e.g., {"frontend", "general"})
+        Frozen set of domain names (e.g., frozenset({"frontend", "general"}))
         Always includes "general" domain for comprehensive coverage.
+        Results are memoized per keyword.
 
     Examples:
         >>> classify_keyword("Electron 技术资讯")
-        {'general', 'frontend'}
+        frozenset({'general', 'frontend'})
 
         >>> classify_keyword("web development")
-        {'general', 'frontend'}  # "web" alias resolves to "frontend"
+        frozenset({'general', 'frontend'})  # "web" alias resolves to "frontend"
 
         >>> classify_keyword("ML models")
-        {'general', 'ai'}  # "ML" alias resolves to "ai"
+        frozenset({'general', 'ai'})  # "ML" alias resolves to "ai"
 
         >>> classify_keyword("云计算")
-        {'general', 'devops'}  # "云" alias resolves to "devops"
+        frozenset({'general', 'devops'})  # "云" alias resolves to "devops"
     """
     keyword_lower = keyword.lower()
     domains = {"general"}  # Always include general sources
@@ -267,11 +317,52 @@ def classify_keyword(keyword: str) -> Set[str]:
         domains.add(DOMAIN_ALIASES[keyword_lower])
 
     # Match against domain keywords
-    for domain, patterns in DOMAIN_KEYWORDS.items():
-        if any(pattern in keyword_lower for pattern in patterns):
-            domains.add(domain)
+    if _AUTOMATON is not None:
+        for _, matched_domains in _AUTOMATON.iter(keyword_lower):
+            domains.update(matched_domains)
+    else:
+        for domain, pattern_re in _DOMAIN_RES.items():
+            if pattern_re.search(keyword_lower):
+                domains.add(domain)
+
+    return frozenset(domains)
+
+
+# Domain index for the most recent source list; "key" holds the ids of its
+# sources and "sources" keeps them alive so those ids can't be reused
+_DOMAIN_INDEX_CACHE: dict = {"key": None, "sources": None, "index": None}
 
-    return domains
+
+def _build_domain_index(all_sources: List[dict]) -> Dict[str, List[int]]:
+    """
+    Map each domain to the positions of the sources covering it.
+
+    Args:
+        all_sources: List of news sources
+
+    Returns:
+        Dict of domain -> list of indexes into all_sources
+    """
+    index: Dict[str, List[int]] = defaultdict(list)
+    for position, source in enumerate(all_sources):
+        for domain in source.get("domains", ["general"]):
+            index[domain].append(position)
+    return index
+
+
+def _get_domain_index(all_sources: List[dict]) -> Dict[str, List[int]]:
+    """
+    Return the domain index for all_sources.
+
+    The index is rebuilt only when the list holds different source objects;
+    source dicts are treated as read-only once loaded.
+    """
+    key = tuple(map(id, all_sources))
+    if _DOMAIN_INDEX_CACHE["key"] != key:
+        _DOMAIN_INDEX_CACHE["index"] = _build_domain_index(all_sources)
+        _DOMAIN_INDEX_CACHE["sources"] = list(all_sources)
+        _DOMAIN_INDEX_CACHE["key"] = key
+    return _DOMAIN_INDEX_CACHE["index"]
 
 
 def get_sources_for_domains(all_sources: List[dict], domains: Set[str]) -> List[dict]:
@@ -279,7 +370,7 @@ def get_sources_for_domains(all_sources: List[dict], domains: Set[str]) -> List[
     Filter news sources by detected domains.
 
     Args:
-        all_sources: List of all available news sources
+        all_sources: List of enabled news sources (see load_sources)
         domains: Set of domain names detected from keyword
 
     Returns:
@@ -287,18 +378,21 @@ def get_sources_for_domains(all_sources: List[dict], domains: Set[str]) -> List[
 
     Examples:
         >>> sources = [
-        ...     {"id": "techcrunch", "domains": ["general"], "enabled": True},
-        ...     {"id": "react-blog", "domains": ["frontend"], "enabled": True},
-        ...     {"id": "disabled", "domains": ["frontend"], "enabled": False}
+        ...     {"id": "techcrunch", "domains": ["general"]},
+        ...     {"id": "react-blog", "domains": ["frontend"]},
+        ...     {"id": "docker-blog", "domains": ["devops"]}
         ... ]
         >>> get_sources_for_domains(sources, {"general", "frontend"})
         [{'id': 'techcrunch', ...}, {'id': 'react-blog', ...}]
     """
-    return [
-        source for source in all_sources
-        if source.get("enabled", True) and
-        any(domain in source.get("domains", ["general"]) for domain in domains)
-    ]
+    index = _get_domain_index(all_sources)
+
+    positions = set()
+    for domain in domains:
+        positions.update(index.get(domain, ()))
+
+    # Keep the original source order
+    return [all_sources[position] for position in sorted(positions)]
 
 
 def get_domain_description(domain: str) -> str:
@@ -3,11 +3,30 @@
 Heat score calculator for news articles
 """
 
+import re
+import sys
 from datetime import datetime, timezone
 from collections import defaultdict
+from functools import lru_cache
 
+try:
+    from ciso8601 import parse_datetime as _ciso_parse
+except ImportError:
+    _ciso_parse = None
 
-def calculate_heat_score(article, all_articles, keyword):
+# Python 3.11+ fromisoformat accepts a trailing 'Z' natively
+if sys.version_info >= (3, 11):
+    _fromisoformat = datetime.fromisoformat
+else:
+    def _fromisoformat(value):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+# Precompiled patterns for normalize_title
+PUNCT_RE = re.compile(r'[^\w\s]')
+WS_RE = re.compile(r'\s+')
+
+
+def calculate_heat_score(article, all_articles, keyword, title_index=None, now=None, keyword_lower=None):
     """
     Calculate heat score for an article
 
@@ -23,6 +42,11 @@ def calculate_heat_score(article, all_articles, keyword):
         article: Article dict
         all_articles: List of all articles (for finding duplicates)
         keyword: Search keyword
+        title_index: Optional result of build_title_index(all_articles);
+            pass it when scoring many articles to avoid rescanning the list
+        now: Optional reference time (aware UTC datetime) for time decay;
+            pass one value when scoring a batch (default: current time)
+        keyword_lower: Optional keyword.lower(), computed once per batch
 
     Returns:
         Heat score (0-100)
@@ -35,8 +59,9 @@ def calculate_heat_score(article, all_articles, keyword):
     # Time decay
     if article.get("published_at"):
         try:
-            pub_time = datetime.fromisoformat(article["published_at"].replace('Z', '+00:00'))
-            now = datetime.now(timezone.utc)
+            pub_time = parse_pub_time(article["published_at"])
+            if now is None:
+                now = datetime.now(timezone.utc)
             hours_ago = (now - pub_time).total_seconds() / 3600
 
             if hours_ago <= 24:
@@ -53,16 +78,7 @@ def calculate_heat_score(article, all_articles, keyword):
 
     # Keyword match quality
     if keyword:
-        keyword_lower = keyword.lower()
-        title_lower = article.get("title", "").lower()
-        summary_lower = article.get("summary", "").lower()
-
-        if keyword_lower == title_lower:
-            score += 30  # Exact match
-        elif keyword_lower in title_lower:
-            score += 15  # Partial match in title
-        elif keyword_lower in summary_lower:
-            score += 5   # Match in summary
+        score += keyword_bonus(article, keyword_lower or keyword.lower())
 
     # HN engagement bonus
     if "hn_points" in article:
@@ -78,34 +94,101 @@ def calculate_heat_score(article, all_articles, keyword):
 
     # Multi-source bonus (check for duplicate titles)
     if article.get("title"):
-        title_normalized = normalize_title(article["title"])
-        duplicate_count = sum(
-            1 for a in all_articles
-            if a.get("title") and normalize_title(a["title"]) == title_normalized
-            and a["source"] != article["source"]
-        )
+        duplicate_count = len(find_duplicate_sources(article, all_articles, title_index))
         score += duplicate_count * 20  # +20 per duplicate source
 
     # Normalize to 0-100
     return min(score, 100)
 
 
+def calculate_heat_scores(articles, keyword, title_index=None, now=None):
+    """
+    Calculate heat scores for a batch of articles
+
+    Same scoring as calculate_heat_score, with the title index, reference
+    time and lowercased keyword computed once for the whole batch.
+
+    Args:
+        articles: List of all articles
+        keyword: Search keyword
+        title_index: Optional result of build_title_index(articles)
+        now: Optional reference time (default: current time)
+
+    Returns:
+        List of heat scores (0-100), aligned with articles
+    """
+    if title_index is None:
+        title_index = build_title_index(articles)
+    if now is None:
+        now = datetime.now(timezone.utc)
+
+    keyword_lower = keyword.lower() if keyword else None
+
+    return [
+        calculate_heat_score(a, articles, keyword, title_index, now=now, keyword_lower=keyword_lower)
+        for a in articles
+    ]
+
+
+def keyword_bonus(article, keyword_lower):
+    """Keyword match quality: title exact=+30, title partial=+15, summary=+5"""
+    title_lower = article.get("title", "").lower()
+
+    if keyword_lower == title_lower:
+        return 30  # Exact match
+    elif keyword_lower in title_lower:
+        return 15  # Partial match in title
+    elif keyword_lower in article.get("summary", "").lower():
+        return 5   # Match in summary
+    return 0
+
+
+@lru_cache(maxsize=4096)
+def parse_pub_time(published_at):
+    """Parse an ISO 8601 timestamp (memoized; articles share few distinct values)"""
+    if _ciso_parse is not None:
+        try:
+            return _ciso_parse(published_at)
+        except ValueError:
+            pass
+    return _fromisoformat(published_at)
+
+
+@lru_cache(maxsize=4096)
 def normalize_title(title):
-    """Normalize title for duplicate detection"""
-    import re
+    """Normalize title for duplicate detection (memoized; each title is looked up several times per search)"""
     # Remove common punctuation and whitespace, lowercase
-    title = re.sub(r'[^\w\s]', '', title.lower())
-    title = re.sub(r'\s+', ' ', title).strip()
+    title = PUNCT_RE.sub('', title.lower())
+    title = WS_RE.sub(' ', title).strip()
     return title
 
 
-def find_duplicate_sources(article, all_articles):
+def build_title_index(all_articles):
+    """
+    Group article sources by normalized title in a single pass
+
+    Args:
+        all_articles: List of all articles
+
+    Returns:
+        Dict mapping normalized title to the list of sources that carry it
+        (one entry per article, in article order)
+    """
+    index = defaultdict(list)
+    for a in all_articles:
+        if a.get("title"):
+            index[normalize_title(a["title"])].append(a["source"])
+    return index
+
+
+def find_duplicate_sources(article, all_articles, title_index=None):
     """
     Find other sources that have the same story
 
     Args:
         article: Article dict
         all_articles: List of all articles
+        title_index: Optional result of build_title_index(all_articles)
 
     Returns:
         List of source names with duplicate stories
@@ -113,16 +196,11 @@ def find_duplicate_sources(article, all_articles):
     if not article.get("title"):
         return []
 
-    title_normalized = normalize_title(article["title"])
-
-    duplicates = []
-    for a in all_articles:
-        if (a.get("title") and
-            normalize_title(a["title"]) == title_normalized and
-            a["source"] != article["source"]):
-            duplicates.append(a["source"])
+    if title_index is None:
+        title_index = build_title_index(all_articles)
 
-    return duplicates
+    sources = title_index.get(normalize_title(article["title"]), [])
+    return [source for source in sources if source != article["source"]]
 
 
 if __name__ == "__main__":
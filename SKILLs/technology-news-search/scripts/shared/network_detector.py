@@ -3,20 +3,35 @@
 Network connectivity detector for news-technology skill
 
 Silently detects if user can access global sources and automatically
-falls back to China-only sources if needed. Detection is cached for
-5 minutes to avoid repeated checks.
+falls back to China sources (plus any global source host that still
+answers) if needed. Detection is cached for 5 minutes to avoid repeated
+checks.
 """
 
+import json
+import os
+import tempfile
 import urllib.request
 import socket
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
+from urllib.parse import urlsplit
 
 
 # Cache file location
 CACHE_FILE = Path(__file__).parent.parent.parent / ".network_cache"
 CACHE_DURATION = 300  # 5 minutes in seconds
 
+# In-process copy of the cached result, authoritative once set; ts is when it was detected
+_MEM_CACHE = {"value": None, "ts": 0.0}
+
+# Per-host reachability cache: {"host:port": [reachable, checked_at]}
+HOST_CACHE_FILE = Path(__file__).parent.parent.parent / ".host_cache"
+HOST_PROBE_TIMEOUT = 1.0  # seconds per TCP connect
+HOST_PROBE_WORKERS = 32
+
 
 def check_global_access(timeout=3, use_cache=True):
     """
@@ -44,21 +59,24 @@ def check_global_access(timeout=3, use_cache=True):
         ('https://techcrunch.com/feed/', 200),
     ]
 
-    for url, expected_status in test_urls:
-        try:
-            req = urllib.request.Request(
-                url,
-                headers={'User-Agent': 'Mozilla/5.0'}
-            )
-            with urllib.request.urlopen(req, timeout=timeout) as response:
-                if response.status == expected_status:
-                    # Success - global sources accessible
-                    result = True
-                    _write_cache(result)
-                    return result
-        except (urllib.error.URLError, socket.timeout, Exception):
-            # This URL failed, try next one
-            continue
+    # Probe all URLs at once; the first success wins. The executor is not
+    # used as a context manager so a slow loser doesn't delay the answer.
+    executor = ThreadPoolExecutor(max_workers=len(test_urls))
+    try:
+        futures = [
+            executor.submit(_probe, url, expected_status, timeout)
+            for url, expected_status in test_urls
+        ]
+        for future in as_completed(futures):
+            if future.result():
+                # Success - global sources accessible
+                for other in futures:
+                    other.cancel()
+                result = True
+                _write_cache(result)
+                return result
+    finally:
+        executor.shutdown(wait=False)
 
     # All tests failed - global sources not accessible
     result = False
@@ -66,6 +84,24 @@ def check_global_access(timeout=3, use_cache=True):
     return result
 
 
+def _probe(url, expected_status, timeout):
+    """
+    Request a test URL.
+
+    Returns:
+        True if it answered with expected_status, False on any error
+    """
+    try:
+        req = urllib.request.Request(
+            url,
+            headers={'User-Agent': 'Mozilla/5.0'}
+        )
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return response.status == expected_status
+    except (urllib.error.URLError, socket.timeout, Exception):
+        return False
+
+
 def _read_cache():
     """
     Read cached network detection result.
@@ -73,21 +109,32 @@ def _read_cache():
     Returns:
         True/False if cache is valid, None if cache is stale or missing
     """
+    # In-process result first; the file is only consulted once per process
+    if _MEM_CACHE["value"] is not None and time.time() - _MEM_CACHE["ts"] <= CACHE_DURATION:
+        return _MEM_CACHE["value"]
+
     try:
         if not CACHE_FILE.exists():
             return None
 
         # Check if cache is still fresh
-        cache_age = time.time() - CACHE_FILE.stat().st_mtime
+        mtime = CACHE_FILE.stat().st_mtime
+        cache_age = time.time() - mtime
         if cache_age > CACHE_DURATION:
             # Cache expired
             CACHE_FILE.unlink()
             return None
 
-        # Read cached result
+        # Read cached result; anything else (e.g. an empty file) is a miss
         with open(CACHE_FILE, 'r') as f:
-            value = f.read().strip()
-            return value == 'true'
+            content = f.read().strip()
+        if content not in ('true', 'false'):
+            return None
+        value = content == 'true'
+
+        _MEM_CACHE["value"] = value
+        _MEM_CACHE["ts"] = mtime
+        return value
     except Exception:
         # Any error reading cache, ignore it
         return None
@@ -97,13 +144,142 @@ def _write_cache(result):
     """
     Write network detection result to cache.
 
+    The in-process copy is updated immediately; the cache file is written
+    on a background thread so disk I/O stays off the search path. The thread
+    is not a daemon, so interpreter exit waits for the (tiny) write.
+
     Args:
         result: True if global accessible, False otherwise
     """
+    _MEM_CACHE["value"] = result
+    _MEM_CACHE["ts"] = time.time()
+
+    threading.Thread(target=_persist_cache, args=(result,)).start()
+
+
+def _persist_cache(result):
+    """
+    Write network detection result to the cache file.
+
+    Writes a temp file and renames it into place, so a process killed
+    mid-write never leaves a truncated cache.
+    """
     try:
         CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(CACHE_FILE, 'w') as f:
-            f.write('true' if result else 'false')
+        fd, tmp_path = tempfile.mkstemp(prefix=CACHE_FILE.name + '.', dir=CACHE_FILE.parent)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write('true' if result else 'false')
+            os.replace(tmp_path, CACHE_FILE)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except Exception:
+        # Silently fail if can't write cache
+        pass
+
+
+def check_hosts_reachable(endpoints, timeout=HOST_PROBE_TIMEOUT, use_cache=True):
+    """
+    Check which (host, port) endpoints accept TCP connections.
+
+    Endpoints without a fresh cached result are probed concurrently. DNS
+    lookups have no timeout of their own, so the whole batch is bounded at
+    twice the connect timeout; endpoints still unresolved or connecting by
+    then count as unreachable.
+
+    Args:
+        endpoints: Iterable of (host, port) tuples
+        timeout: Connect timeout in seconds for each probe (default: 1)
+        use_cache: Whether to use cached per-host results (default: True)
+
+    Returns:
+        Dict of (host, port) -> True if reachable, False otherwise
+    """
+    now = time.time()
+    cache = _read_host_cache() if use_cache else {}
+
+    results = {}
+    missing = []
+    for host, port in set(endpoints):
+        entry = cache.get(f"{host}:{port}")
+        if entry is not None and now - entry[1] <= CACHE_DURATION:
+            results[(host, port)] = entry[0]
+        else:
+            missing.append((host, port))
+
+    if missing:
+        # Not a context manager: probes stuck in DNS must not hold up the answer
+        executor = ThreadPoolExecutor(max_workers=min(len(missing), HOST_PROBE_WORKERS))
+        try:
+            futures = [executor.submit(_probe_host, host, port, timeout) for host, port in missing]
+            wait(futures, timeout=timeout * 2)
+            for (host, port), future in zip(missing, futures):
+                reachable = future.done() and future.result()
+                future.cancel()
+                results[(host, port)] = reachable
+                cache[f"{host}:{port}"] = [reachable, now]
+        finally:
+            executor.shutdown(wait=False)
+        _write_host_cache(cache)
+
+    return results
+
+
+def _probe_host(host, port, timeout):
+    """Return True if a TCP connection to host:port succeeds within timeout"""
+    try:
+        with socket.create_connection((host, port), timeout):
+            return True
+    except (OSError, socket.timeout):
+        return False
+
+
+def _source_endpoint(source):
+    """
+    (host, port) a source is fetched from.
+
+    Returns:
+        Tuple, or None if the source URL has no usable host
+    """
+    try:
+        parts = urlsplit(source.get('url', ''))
+        port = parts.port or (80 if parts.scheme == 'http' else 443)
+    except ValueError:
+        return None
+    if not parts.hostname:
+        return None
+    return (parts.hostname, port)
+
+
+def _read_host_cache():
+    """
+    Read cached per-host reachability results.
+
+    Returns:
+        Dict of "host:port" -> [reachable, checked_at] (empty if missing or unreadable)
+    """
+    try:
+        with open(HOST_CACHE_FILE, 'r') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except Exception:
+        # Missing or corrupt cache, ignore it
+        return {}
+
+
+def _write_host_cache(cache):
+    """
+    Write per-host reachability results to cache, dropping expired entries.
+
+    Args:
+        cache: Dict of "host:port" -> [reachable, checked_at]
+    """
+    now = time.time()
+    try:
+        HOST_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(HOST_CACHE_FILE, 'w') as f:
+            json.dump({k: v for k, v in cache.items() if now - v[1] <= CACHE_DURATION}, f)
     except Exception:
         # Silently fail if can't write cache
         pass
@@ -117,7 +293,7 @@ def filter_sources_by_network(all_sources, force_region=None):
     This function is completely silent - no output to user.
 
     Args:
-        all_sources: List of all news sources
+        all_sources: List of enabled news sources (see load_sources)
         force_region: Force specific region ('cn' or 'global'), None for auto
 
     Returns:
@@ -125,19 +301,25 @@ def filter_sources_by_network(all_sources, force_region=None):
     """
     # Force region if specified (for testing)
     if force_region == 'cn':
-        return [s for s in all_sources if s.get('region') == 'cn' and s.get('enabled', True)]
+        return [s for s in all_sources if s.get('region') == 'cn']
     elif force_region == 'global':
-        return [s for s in all_sources if s.get('enabled', True)]
+        return list(all_sources)
 
     # Auto-detect network
     can_access_global = check_global_access()
 
     if can_access_global:
         # Network is good - use all sources
-        return [s for s in all_sources if s.get('enabled', True)]
+        return list(all_sources)
     else:
-        # Network is restricted - use only China sources
-        return [s for s in all_sources if s.get('region') == 'cn' and s.get('enabled', True)]
+        # Network is restricted - use China sources, plus global sources
+        # whose host still accepts connections
+        endpoints = [_source_endpoint(s) for s in all_sources if s.get('region') != 'cn']
+        reachable = check_hosts_reachable(e for e in endpoints if e is not None)
+        return [
+            s for s in all_sources
+            if s.get('region') == 'cn' or reachable.get(_source_endpoint(s), False)
+        ]
 
 
 if __name__ == "__main__":
@@ -155,7 +337,7 @@ if __name__ == "__main__":
         print("  → Will use all 75 sources (cn + global)")
     else:
         print(f"✗ Global sources not accessible ({elapsed:.0f}ms)")
-        print("  → Will use 18 China sources only")
+        print("  → Will use 18 China sources, plus global sources whose host is reachable")
 
     print()
     print("Testing with cache...")
@@ -3,12 +3,399 @@
 HTTP utility functions for fetching web content
 """
 
+import asyncio
+import atexit
+import codecs
+import email.utils
+import functools
+import gzip
+import http.client
+import json
+import logging
+import random
+import re
+import ssl
+import threading
 import urllib.request
 import urllib.error
 import time
-import sys
+import zlib
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from types import MappingProxyType
+from urllib.parse import urlsplit
 
-def fetch_url(url, timeout=10, max_retries=3, user_agent=None):
+try:
+    import urllib3
+except ImportError:
+    urllib3 = None
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+# Request headers shared by all fetch helpers (read-only; copy to modify)
+_DEFAULT_HEADERS = MappingProxyType({
+    "User-Agent": DEFAULT_USER_AGENT,
+    "Accept": "*/*",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Accept-Language": "en-US,en;q=0.9,zh-CN;q=0.8,zh;q=0.7"
+})
+
+# Retry delays (seconds) for fetch_url's decorrelated-jitter backoff
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+# Per-host circuit breaker: after BREAKER_THRESHOLD consecutive failures a
+# host is skipped for BREAKER_COOLDOWN seconds, then given one more try.
+# host -> (consecutive failures, open until timestamp)
+_BREAKER = {}
+_BREAKER_LOCK = threading.Lock()
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 60.0
+
+# Results memoized by _ttl_cache: (function name, url) -> (stored at, value)
+_TTL_CACHE = OrderedDict()
+_TTL_CACHE_SIZE = 256
+_TTL_CACHE_LOCK = threading.Lock()
+
+# One TLS context (CA bundle loaded once) shared by every HTTPS connection
+_SSL_CONTEXT = ssl.create_default_context()
+
+
+class _ErrorStatusProcessor(urllib.request.HTTPErrorProcessor):
+    """Return 4xx/5xx responses to the caller instead of raising HTTPError"""
+
+    def http_response(self, request, response):
+        if response.status >= 400:
+            return response
+        return super().http_response(request, response)
+
+    https_response = http_response
+
+
+# With urllib3 installed, all fetches share a keep-alive connection pool so
+# repeated requests to a host skip DNS lookup and the TCP/TLS handshake.
+# Redirects are followed by urllib3; retries stay in fetch_url's own loop.
+if urllib3 is not None:
+    _POOL = urllib3.PoolManager(num_pools=32, maxsize=16, ssl_context=_SSL_CONTEXT)
+    atexit.register(_POOL.clear)  # close pooled sockets cleanly on exit
+    _POOL_RETRIES = urllib3.Retry(total=None, connect=0, read=0, status=0, other=0, redirect=5)
+else:
+    _POOL = None
+    _OPENER = urllib.request.build_opener(
+        _ErrorStatusProcessor,
+        urllib.request.HTTPSHandler(context=_SSL_CONTEXT)
+    )
+
+# Failures of a single attempt that fetch_url retries: OSError covers
+# URLError, timeouts, resets and SSL errors; zlib.error/EOFError come from
+# corrupt or truncated compressed bodies
+_NETWORK_ERRORS = (OSError, http.client.HTTPException, zlib.error, EOFError)
+if urllib3 is not None:
+    _NETWORK_ERRORS += (urllib3.exceptions.HTTPError,)
+if brotli is not None:
+    _NETWORK_ERRORS += (brotli.error,)
+
+# Recent responses, served directly while fresh (Cache-Control max-age /
+# Expires) and revalidated with conditional GETs afterwards:
+# url -> (etag, last_modified, raw body, charset, fresh_until), least recently used first
+_RESPONSE_CACHE = OrderedDict()
+_RESPONSE_CACHE_SIZE = 1024
+_RESPONSE_CACHE_LOCK = threading.Lock()
+MAX_AGE_RE = re.compile(r'max-age\s*=\s*(\d+)')
+
+CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+# <meta charset=...> / <meta http-equiv=... content="...; charset=..."> near the top of a page
+META_CHARSET_RE = re.compile(rb'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+META_SNIFF_BYTES = 2048
+
+
+def _http_get(url, headers, timeout):
+    """
+    Issue a single GET request
+
+    Returns:
+        Tuple of (status code, response headers, body bytes); error
+        statuses (and 304) are returned, not raised, with an empty body
+    """
+    if _POOL is not None:
+        response = _POOL.request(
+            "GET", url,
+            headers=headers,
+            timeout=urllib3.Timeout(connect=timeout, read=timeout),
+            retries=_POOL_RETRIES,
+            preload_content=False
+        )
+        try:
+            if response.status >= 400:
+                # Error bodies are never used; discard without buffering
+                response.drain_conn()
+                return response.status, response.headers, b""
+            return response.status, response.headers, response.read()
+        finally:
+            response.release_conn()
+
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with _OPENER.open(req, timeout=timeout) as response:
+            if response.status >= 400:
+                return response.status, response.headers, b""
+            body = response.read()
+            encoding = response.headers.get("Content-Encoding")
+            if encoding:
+                body = _decompress(body, encoding)
+            return response.status, response.headers, body
+    except urllib.error.HTTPError as e:
+        e.close()
+        return e.code, e.headers, b""
+
+
+def _hedged_get(url, headers, timeout):
+    """
+    _http_get with a hedge: if no response arrives within timeout / 2, send
+    the same request again and use whichever answers first
+
+    Returns:
+        Same tuple as _http_get; raises only if both requests fail
+    """
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        first = executor.submit(_http_get, url, headers, timeout)
+        done, _ = wait([first], timeout=timeout / 2)
+        if done:
+            return first.result()
+
+        pending = {first, executor.submit(_http_get, url, headers, timeout)}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            succeeded = [future for future in done if future.exception() is None]
+            if succeeded:
+                return succeeded[0].result()
+            if not pending:
+                return done.pop().result()
+    finally:
+        # The losing request can't be interrupted; let it finish in the background
+        executor.shutdown(wait=False)
+
+
+def _decompress(body, encoding):
+    """Undo a gzip/deflate/br Content-Encoding (urllib does not)"""
+    encoding = encoding.strip().lower()
+    if encoding in ("gzip", "x-gzip"):
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        # Servers send either zlib-wrapped or raw deflate data
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    if encoding == "br" and brotli is not None:
+        return brotli.decompress(body)
+    return body
+
+
+def _cached_response(url):
+    """Return (etag, last_modified, body, charset, fresh_until) cached for url, or None"""
+    with _RESPONSE_CACHE_LOCK:
+        entry = _RESPONSE_CACHE.get(url)
+        if entry is not None:
+            _RESPONSE_CACHE.move_to_end(url)
+        return entry
+
+
+def _store_response(url, response_headers, body, charset, previous=None):
+    """
+    Remember a response's validators, freshness lifetime, raw body and charset
+
+    Args:
+        previous: Cached entry a 304 response revalidated; validators the
+            304 does not repeat are kept from it
+    """
+    etag = response_headers.get("ETag")
+    last_modified = response_headers.get("Last-Modified")
+    if previous is not None:
+        etag = etag or previous[0]
+        last_modified = last_modified or previous[1]
+    cache_control = (response_headers.get("Cache-Control") or "").lower()
+    fresh_until = _fresh_until(response_headers, cache_control)
+
+    with _RESPONSE_CACHE_LOCK:
+        if "no-store" in cache_control or not (etag or last_modified or fresh_until):
+            _RESPONSE_CACHE.pop(url, None)
+            return
+        _RESPONSE_CACHE[url] = (etag, last_modified, body, charset, fresh_until)
+        _RESPONSE_CACHE.move_to_end(url)
+        if len(_RESPONSE_CACHE) > _RESPONSE_CACHE_SIZE:
+            _RESPONSE_CACHE.popitem(last=False)
+
+
+def _fresh_until(response_headers, cache_control):
+    """
+    Time until which a response may be reused without asking the server
+
+    Uses Cache-Control max-age (less the Age header), else Expires.
+
+    Returns:
+        Unix timestamp, or 0.0 if the response must be revalidated
+    """
+    if "no-cache" in cache_control:
+        return 0.0
+
+    now = time.time()
+    match = MAX_AGE_RE.search(cache_control)
+    if match:
+        try:
+            age = int(response_headers.get("Age") or 0)
+        except ValueError:
+            age = 0
+        max_age = int(match.group(1)) - age
+        return now + max_age if max_age > 0 else 0.0
+
+    expires = response_headers.get("Expires")
+    if not expires:
+        return 0.0
+    try:
+        expires_at = email.utils.parsedate_to_datetime(expires).timestamp()
+    except (TypeError, ValueError):
+        return 0.0  # Invalid Expires means already expired
+    return expires_at if expires_at > now else 0.0
+
+
+def _header_charset(response_headers):
+    """
+    Charset declared in the Content-Type response header
+
+    Returns:
+        Python codec name, or None if missing or unknown
+    """
+    match = CHARSET_RE.search(response_headers.get("Content-Type") or "")
+    return _codec_name(match.group(1)) if match else None
+
+
+def _sniff_charset(content):
+    """
+    Charset declared by a BOM or a <meta> tag at the start of the body
+
+    Returns:
+        Python codec name, or None if not declared
+    """
+    if content.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    match = META_CHARSET_RE.search(content, 0, META_SNIFF_BYTES)
+    return _codec_name(match.group(1).decode("ascii")) if match else None
+
+
+def _codec_name(label):
+    """Map a charset label to a Python text codec name (None if unknown)"""
+    try:
+        info = codecs.lookup(label)
+    except LookupError:
+        return None
+    # Reject bytes-to-bytes codecs such as base64, hex or zip
+    if not getattr(info, "_is_text_encoding", True):
+        return None
+    encoding = info.name
+    # Pages labelled gb2312/gbk routinely use characters outside it
+    return "gb18030" if encoding in ("gb2312", "gbk") else encoding
+
+
+def _retry_after(response_headers):
+    """
+    Seconds the server asked us to wait via Retry-After
+
+    Returns:
+        Float seconds, or None if absent or unparseable
+    """
+    value = response_headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _backoff_delay(previous, retry_after=None):
+    """
+    Next retry delay using decorrelated jitter
+
+    Each delay is drawn between the base delay and three times the previous
+    one, so parallel clients do not retry in lockstep.
+
+    Args:
+        previous: Previous delay in seconds (0 before the first retry)
+        retry_after: Server-requested delay in seconds, if any
+
+    Returns:
+        Delay in seconds, capped at RETRY_MAX_DELAY
+    """
+    delay = min(RETRY_MAX_DELAY, random.uniform(RETRY_BASE_DELAY, (previous or RETRY_BASE_DELAY) * 3))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, RETRY_MAX_DELAY))
+    return delay
+
+
+def _breaker_open(host):
+    """Return True if requests to host are currently being skipped"""
+    with _BREAKER_LOCK:
+        _, open_until = _BREAKER.get(host, (0, 0.0))
+    return time.time() < open_until
+
+
+def _record_host_result(host, success):
+    """Update host's circuit breaker after a request attempt"""
+    with _BREAKER_LOCK:
+        if success:
+            _BREAKER.pop(host, None)
+            return
+        fails, open_until = _BREAKER.get(host, (0, 0.0))
+        fails += 1
+        if fails >= BREAKER_THRESHOLD:
+            open_until = time.time() + BREAKER_COOLDOWN
+        _BREAKER[host] = (fails, open_until)
+
+
+def _request_headers(user_agent=None):
+    """
+    Request headers for a fetch
+
+    Returns:
+        The shared read-only _DEFAULT_HEADERS, or a new dict when a custom
+        user agent is given
+    """
+    if not user_agent:
+        return _DEFAULT_HEADERS
+    return {**_DEFAULT_HEADERS, "User-Agent": user_agent}
+
+
+def fetch_url(url, timeout=10, max_retries=3, user_agent=None, decode=True, hedge=False):
     """
     Fetch content from a URL with retries and error handling
 
@@ -17,55 +404,211 @@ def fetch_url(url, timeout=10, max_retries=3, user_agent=None):
         timeout: Request timeout in seconds
         max_retries: Maximum number of retry attempts
         user_agent: Optional custom user agent string
+        decode: Whether to decode the body to a string (default: True)
+        hedge: Send a second request if the first is slow, see _hedged_get (default: False)
 
     Returns:
-        Response content as string, or None on failure
+        Response content as string (raw bytes if decode is False), or None on failure
     """
-    if user_agent is None:
-        user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+    # Reject malformed URLs up front: retrying them can't help, and urllib3
+    # would otherwise treat a scheme-less "example" as a bare hostname
+    try:
+        parts = urlsplit(url)
+    except ValueError as e:
+        logger.warning("Invalid URL %s: %s", url, e)
+        return None
+    if parts.scheme.lower() not in ("http", "https") or not parts.netloc:
+        logger.warning("Invalid URL %s: not an absolute http(s) URL", url)
+        return None
+    host = parts.netloc
+    headers = _request_headers(user_agent)
 
-    headers = {
-        "User-Agent": user_agent,
-        "Accept": "*/*",
-        "Accept-Language": "en-US,en;q=0.9,zh-CN;q=0.8,zh;q=0.7"
-    }
+    # Reuse a previously seen response while fresh, then revalidate it
+    # instead of downloading it again
+    cached = _cached_response(url)
+    if cached is not None:
+        if time.time() < cached[4]:
+            return decode_content(cached[2], cached[3]) if decode else cached[2]
+        headers = dict(headers)
+        etag, last_modified = cached[:2]
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
 
+    delay = 0
     for attempt in range(max_retries):
+        if _breaker_open(host):
+            logger.warning("Skipping %s: %s is failing repeatedly", url, host)
+            return None
+
         try:
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req, timeout=timeout) as response:
-                content = response.read()
-
-                # Try different encodings
-                for encoding in ['utf-8', 'gb2312', 'gbk', 'iso-8859-1']:
-                    try:
-                        return content.decode(encoding)
-                    except UnicodeDecodeError:
-                        continue
-
-                # If all encodings fail, use utf-8 with error handling
-                return content.decode('utf-8', errors='ignore')
-
-        except urllib.error.HTTPError as e:
-            print(f"HTTP Error {e.code} for {url}", file=sys.stderr)
-            if e.code in [404, 403, 401]:  # Don't retry these
-                return None
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)  # Exponential backoff
+            get = _hedged_get if hedge else _http_get
+            status, response_headers, content = get(url, headers, timeout)
 
-        except urllib.error.URLError as e:
-            print(f"URL Error for {url}: {e.reason}", file=sys.stderr)
+        except (ValueError, http.client.InvalidURL) as e:
+            # Malformed URL, retrying won't help (checked first: urllib3's
+            # LocationValueError and http.client.InvalidURL would otherwise
+            # match _NETWORK_ERRORS)
+            logger.warning("Invalid URL %s: %s", url, e)
+            return None
+
+        except _NETWORK_ERRORS as e:
+            logger.warning("URL Error for %s: %s", url, getattr(e, 'reason', e))
+            _record_host_result(host, False)
             if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
+                delay = _backoff_delay(delay)
+                time.sleep(delay)
+            continue
+
+        # Only server errors count against the host
+        _record_host_result(host, status < 500)
 
-        except Exception as e:
-            print(f"Unexpected error fetching {url}: {e}", file=sys.stderr)
+        if status >= 400:
+            logger.warning("HTTP Error %s for %s", status, url)
+            if status in [404, 403, 401]:  # Don't retry these
+                return None
             if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
+                delay = _backoff_delay(delay, _retry_after(response_headers))
+                time.sleep(delay)
+            continue
+
+        if status == 304 and cached is not None:
+            content, charset = cached[2:4]
+            _store_response(url, response_headers, content, charset, previous=cached)
+        else:
+            charset = _header_charset(response_headers)
+            _store_response(url, response_headers, content, charset)
+
+        return decode_content(content, charset) if decode else content
 
     return None
 
 
+async def fetch_urls_async(urls, timeout=10, concurrency=32, user_agent=None, decode=True):
+    """
+    Fetch many URLs concurrently
+
+    Uses one aiohttp session when aiohttp is installed; otherwise runs
+    fetch_url on a thread pool. Each URL is tried once (no retries).
+
+    Args:
+        urls: List of URLs to fetch
+        timeout: Connect/read timeout in seconds (per URL, like fetch_url)
+        concurrency: Maximum number of requests in flight
+        user_agent: Optional custom user agent string
+        decode: Whether to decode bodies to strings (default: True)
+
+    Returns:
+        List of response contents as strings (raw bytes if decode is False,
+        None on failure), aligned with urls
+    """
+    if not urls:
+        return []
+
+    if aiohttp is None:
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=min(len(urls), concurrency)) as pool:
+            return await asyncio.gather(*[
+                loop.run_in_executor(pool, lambda u=url: fetch_url(u, timeout, 1, user_agent, decode))
+                for url in urls
+            ])
+
+    connector = aiohttp.TCPConnector(
+        limit=concurrency, limit_per_host=8, ttl_dns_cache=300, ssl=_SSL_CONTEXT
+    )
+    async with aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(sock_connect=timeout, sock_read=timeout),
+        headers=_request_headers(user_agent)
+    ) as session:
+        return await asyncio.gather(*[_fetch_one_async(session, url, decode) for url in urls])
+
+
+async def _fetch_one_async(session, url, decode=True):
+    """Fetch one URL on an aiohttp session; returns None on an error status or network error"""
+    try:
+        async with session.get(url) as response:
+            if response.status >= 400:
+                logger.warning("HTTP Error %s for %s", response.status, url)
+                return None
+            content = await response.read()
+            charset = _header_charset(response.headers)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning("URL Error for %s: %s", url, str(e) or type(e).__name__)
+        return None
+
+    return decode_content(content, charset) if decode else content
+
+
+def fetch_urls(urls, timeout=10, concurrency=32, user_agent=None, decode=True):
+    """Synchronous wrapper around fetch_urls_async"""
+    return asyncio.run(fetch_urls_async(urls, timeout, concurrency, user_agent, decode))
+
+
+def decode_content(content, charset=None):
+    """
+    Decode a response body in a single pass where possible
+
+    Args:
+        content: Body bytes
+        charset: Encoding declared by the server, if any
+
+    Returns:
+        Decoded string
+    """
+    charset = charset or _sniff_charset(content)
+    if charset:
+        return content.decode(charset, errors='replace')
+
+    if charset_normalizer is not None:
+        best = charset_normalizer.from_bytes(content).best()
+        if best is not None:
+            return str(best)
+        return content.decode('utf-8', errors='ignore')
+
+    # Without charset_normalizer, try common encodings in turn
+    for encoding in ['utf-8', 'gb2312', 'gbk', 'iso-8859-1']:
+        try:
+            return content.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+
+    # If all encodings fail, use utf-8 with error handling
+    return content.decode('utf-8', errors='ignore')
+
+
+def _ttl_cache(ttl):
+    """
+    Memoize a url-keyed fetch function for ttl seconds
+
+    Failed fetches (None) are not cached. Callers share the cached object,
+    so they must not mutate it.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(url, *args, **kwargs):
+            key = (fn.__name__, url)
+            now = time.monotonic()
+            with _TTL_CACHE_LOCK:
+                entry = _TTL_CACHE.get(key)
+                if entry is not None and now - entry[0] < ttl:
+                    _TTL_CACHE.move_to_end(key)
+                    return entry[1]
+
+            value = fn(url, *args, **kwargs)
+            if value is not None:
+                with _TTL_CACHE_LOCK:
+                    _TTL_CACHE[key] = (now, value)
+                    _TTL_CACHE.move_to_end(key)
+                    if len(_TTL_CACHE) > _TTL_CACHE_SIZE:
+                        _TTL_CACHE.popitem(last=False)
+            return value
+        return wrapper
+    return decorator
+
+
+@_ttl_cache(60)
 def fetch_json(url, timeout=10):
     """
     Fetch and parse JSON from a URL
@@ -77,13 +620,42 @@ def fetch_json(url, timeout=10):
     Returns:
         Parsed JSON object, or None on failure
     """
-    import json
+    # Parse the raw UTF-8 body directly, skipping the str decode
+    return _parse_json(fetch_url(url, timeout=timeout, decode=False), url)
 
-    content = fetch_url(url, timeout=timeout)
-    if content:
-        try:
-            return json.loads(content)
-        except json.JSONDecodeError as e:
-            print(f"JSON parse error for {url}: {e}", file=sys.stderr)
 
-    return None
+async def fetch_json_many_async(urls, timeout=10, concurrency=32):
+    """
+    Fetch and parse JSON from many URLs concurrently
+
+    Bodies are fetched with fetch_urls_async (one session, no retries) and
+    parsed straight from bytes.
+
+    Args:
+        urls: List of URLs to fetch
+        timeout: Connect/read timeout in seconds (per URL)
+        concurrency: Maximum number of requests in flight
+
+    Returns:
+        List of parsed JSON objects (None on failure), aligned with urls
+    """
+    bodies = await fetch_urls_async(urls, timeout, concurrency, decode=False)
+    return [_parse_json(body, url) for url, body in zip(urls, bodies)]
+
+
+def fetch_json_many(urls, timeout=10, concurrency=32):
+    """Synchronous wrapper around fetch_json_many_async"""
+    return asyncio.run(fetch_json_many_async(urls, timeout, concurrency))
+
+
+def _parse_json(content, url):
+    """Parse a raw JSON body (None if empty or invalid)"""
+    if not content:
+        return None
+    try:
+        if orjson is not None:
+            return orjson.loads(content)
+        return json.loads(content)
+    except ValueError as e:  # orjson and json decode errors both subclass it
+        logger.warning("JSON parse error for %s: %s", url, e)
+        return None